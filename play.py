@@ -14,13 +14,14 @@ from rich.console import Console
 import concurrent.futures
 from pathlib import Path
 
-from utils.generating_utils import (
-    isolate,
-    clean_content,
-)
+from utils.generating_utils import peel
 
+from utils.memory_utils import MemoryMonitor
 from utils.canny_utils import svg_to_canny
 
+# Number of consecutive scrolls without a new link after which a target in the shared store is considered exhausted
+MAX_IDLE_ITERATIONS = 10
+
 
 class CanvaAutomation(object):
     """
@@ -35,21 +36,28 @@ class CanvaAutomation(object):
         scroll: Scrolls the page by the given amount
         init_browser: Initializes the browser instance
         close_browser: Closes the browser instance
+        save_links: Saves the scraped links to the shared store or the per-process file
 
     init:
         url (str): The URL to start the automation process
         count (int): The number of links to scrape
+        browser (Browser): A shared browser instance to open a context in, instead of launching a new one
+        store (dict): A shared URL -> name dictionary to stream the scraped links into
     """
 
     def __init__(
         self,
         url: str,
         count: int = 1,
+        browser=None,
+        store: dict = None,
     ) -> None:
         self.URL = url
         self.count = count
-        self.count = count
         self.pid = os.getpid()
+        self.shared_browser = browser
+        self.store = store
+        self.scraped = set()
 
         try:
             self.filter = self.URL.split("&fTheme=THEME_")[1].split(",")[0].strip()
@@ -60,18 +68,28 @@ class CanvaAutomation(object):
         """
         Starts the automation process by initializing the browser, opening the page, and scraping the links.
         """
-        await self.init_browser()
-        await self.open_page(self.URL)
-        await self.scrape_links()
+        if self.shared_browser is None:
+            await self.init_browser()
+        else:
+            await self.init_context()
+
+        try:
+            await self.open_page(self.URL)
+            await self.scrape_links()
+        finally:
+            if self.shared_browser is not None:
+                await self.context.close()
 
     async def scrape_links(self):
         """
-        Scrapes the logo template links from the Canva page and saves them in the links/starter_links.json file.
+        Scrapes the logo template links from the Canva page and saves them in the links/links_<pid>_<filter>.json file,
+        or in the shared store when one is given.
         """
-        time.sleep(random.randint(2, 3))
+        await asyncio.sleep(random.uniform(2, 3))
         await self.scroll(delta_y=6175.0)
 
         iteration = 1
+        idle_iterations = 0
         logo = {}
 
         console.log("\n[bold purple]Scraping Links...")
@@ -103,21 +121,26 @@ class CanvaAutomation(object):
 
             await self.scroll(delta_y=400.8)
 
-            if iteration % 10 == 0:
-                console.log(f"[bold purple]Saving Links...")
-                data = {}
-                try:
-                    with open(f"links/links_{self.pid}_{self.filter}.json", "r") as f:
-                        data = json.load(f)
-                except Exception as e:
-                    print("Error: ", e)
+            if self.store is not None:
+                # Stream into the shared store every iteration so the count limit is exact
+                scraped = len(self.scraped)
+                self.save_links(logo)
+                logo = {}
 
-                for i in logo.items():
-                    data[i[0]] = i[1]
+                if len(self.scraped) >= self.count:
+                    break
 
-                with open(f"links/links_{self.pid}_{self.filter}.json", "w") as f:
-                    json.dump(data, f)
+                # Stop when the catalogue has run dry and scrolling no longer finds new links
+                idle_iterations = idle_iterations + 1 if len(self.scraped) == scraped else 0
+                if idle_iterations >= MAX_IDLE_ITERATIONS:
+                    console.log(
+                        f"[bold yellow]No new links after {idle_iterations} iterations, stopping at {len(self.scraped)} links for {self.URL}"
+                    )
+                    break
 
+            elif iteration % 10 == 0:
+                console.log(f"[bold purple]Saving Links...")
+                self.save_links(logo)
                 logo = {}
 
                 if iteration * 5 >= self.count:
@@ -125,6 +148,36 @@ class CanvaAutomation(object):
 
             iteration += 1
 
+    def save_links(self, logo: dict):
+        """
+        Saves the scraped links. With a shared store, only the links up to this target's count are added,
+        and links already present in the store are kept as they are. Otherwise the links are merged into
+        the per-process JSON file.
+
+        Args:
+            logo (dict): The scraped URL -> name pairs
+        """
+        if self.store is not None:
+            for url, name in logo.items():
+                if len(self.scraped) >= self.count:
+                    break
+                self.scraped.add(url)
+                self.store.setdefault(url, name)
+            return
+
+        data = {}
+        try:
+            with open(f"links/links_{self.pid}_{self.filter}.json", "r") as f:
+                data = json.load(f)
+        except Exception as e:
+            print("Error: ", e)
+
+        for i in logo.items():
+            data[i[0]] = i[1]
+
+        with open(f"links/links_{self.pid}_{self.filter}.json", "w") as f:
+            json.dump(data, f)
+
     async def download_images(self):
         """
         Downloads the SVG files from the Canva page and saves them in the images directory.
@@ -152,11 +205,11 @@ class CanvaAutomation(object):
             await self.page.get_by_text("Share", exact=True).click(timeout=10000)
 
             # Click on the download option:
-            time.sleep(0.1)
+            await asyncio.sleep(0.1)
             await self.page.get_by_text("Download", exact=True).click(timeout=10000)
 
             # Click on the drop-down menu:
-            time.sleep(0.4)
+            await asyncio.sleep(0.4)
             await self.page.get_by_text("Suggested", exact=True).click(timeout=10000)
 
             # Select the SVG option:
@@ -186,7 +239,7 @@ class CanvaAutomation(object):
         Args:
             xpath (str): The xpath of the element to click
         """
-        time.sleep(0.5)
+        await asyncio.sleep(0.5)
         button = self.page.locator(f"xpath={xpath}")
         await button.click()
 
@@ -211,7 +264,7 @@ class CanvaAutomation(object):
             await self.page.mouse.wheel(
                 delta_x=0, delta_y=200
             )  # Scroll down by 200 pixels
-            time.sleep(np.random.random_sample() * 1.5)
+            await asyncio.sleep(np.random.random_sample() * 1.5)
 
         await self.page.mouse.wheel(delta_x=0, delta_y=delta_y - 200 * (delta_y // 200))
 
@@ -231,6 +284,17 @@ class CanvaAutomation(object):
 
         self.page = await self.context.new_page()
 
+    async def init_context(self):
+        """
+        Opens a new context and page in the shared browser instance.
+        """
+        self.context = await self.shared_browser.new_context(
+            storage_state="playwright_state/canva_state.json",
+            no_viewport=True,
+        )
+
+        self.page = await self.context.new_page()
+
     async def close_browser(self):
         """
         Closes the browser instance and stops Playwright.
@@ -293,47 +357,13 @@ def generate(input_dir, dataset_dir, index: int = 0):
         gt = svg_to_canny(content=svg_content, save_only=True)
         cv2.imwrite(os.path.join(output_dir, "gt.png"), gt)
 
-        iteration = 1
-        while True:
-            start_index_clip_path = svg_content.find("<g clip-path")
-            start_index_mask = svg_content.find("<g mask")
-
-            # Select minimum of the two indices
-            start_index = min(start_index_clip_path, start_index_mask)
-            if start_index == -1:
-                start_index = max(start_index_clip_path, start_index_mask)
-            if start_index == -1:
-                # No clip-path or mask found/left
-                break
-
-            # Fetch the end index of the clip-path or mask and remove the content
-            svg_content = isolate(svg_content, start_index + 1)
-
-            # Save modified content to new file in respective directory
+        # Convert each variant to a Canny Edge Image and save it in the respective directory
+        for iteration, variant in peel(svg_content):
             output_path = os.path.join(
                 output_dir, f"{file_name_without_extension}_{iteration}.png"
             )
-
-            # Convert the SVG content to Canny Edge Image
-            canny = svg_to_canny(content=svg_content)
-
-            # Save the Canny Edge Image
+            canny = svg_to_canny(content=variant)
             cv2.imwrite(output_path, canny)
-            iteration += 1
-
-        # Finally, remove all possible rouge instances and convert the content to white text and black background
-        cleaned_content = clean_content(svg_content)
-
-        # Save modified content to new file in respective directory
-        output_path = os.path.join(
-            output_dir, f"{file_name_without_extension}_{iteration-1}.png"
-        )
-
-        # Convert the cleaned content to Canny Edge Image
-        canny = svg_to_canny(content=cleaned_content)
-
-        # Save the Canny Edge Image
-        cv2.imwrite(output_path, canny)
 
 
 def scrape(url: str, count: int):
@@ -349,6 +379,51 @@ def scrape(url: str, count: int):
     asyncio.run(scraper.start())
 
 
+async def scrape_target(scraper: CanvaAutomation, semaphore: asyncio.Semaphore):
+    """
+    Scrapes the links for a single target once a slot in the semaphore is free
+
+    Args:
+        scraper (CanvaAutomation): The scraper of the target
+        semaphore (asyncio.Semaphore): The semaphore limiting the number of open contexts
+    """
+    async with semaphore:
+        await scraper.start()
+
+
+async def scrape_concurrent(targets: list, workers: int):
+    """
+    Scrapes the links from all the given targets concurrently, each in its own context of a single browser
+
+    Args:
+        targets (list): The (url, count) pairs to scrape the links from
+        workers (int): The maximum number of targets scraped at the same time
+
+    Returns: The deduplicated dictionary of scraped links
+    """
+    store = {}
+    semaphore = asyncio.Semaphore(workers)
+    async with async_playwright() as p:
+        browser = await p.firefox.launch(headless=False, args=["--kiosk"])
+
+        scrapers = [
+            CanvaAutomation(url=url, count=count, browser=browser, store=store)
+            for url, count in targets
+        ]
+        results = await asyncio.gather(
+            *[scrape_target(scraper, semaphore) for scraper in scrapers],
+            return_exceptions=True,
+        )
+
+        for scraper, result in zip(scrapers, results):
+            if isinstance(result, Exception):
+                console.log(f"[bold red]Error Scraping from {scraper.URL}: {result}")
+
+        await browser.close()
+
+    return store
+
+
 if __name__ == "__main__":
     console = Console()
 
@@ -372,31 +447,53 @@ if __name__ == "__main__":
             targets = f.readlines()
 
         for target in targets:
-            urls.append(target.strip().split(","))
-        
-        if PARALLEL == "n":
-            for url in urls:
-                scrape(url[0], int(url[1]))
+            if target.strip():
+                urls.append(target.strip().split(","))
+
+        start_time = time.perf_counter()
+        memory_monitor = MemoryMonitor()
+        memory_monitor.start()
+
+        if PARALLEL == "a":
+            console.log(
+                f"[bold yellow]You have opted for [bold blue]Concurrent Scraping [bold yellow]of [bold blue]{len(urls)} [bold yellow]targets in a single browser with [bold blue]{WORKERS} [bold yellow]at a time."
+            )
+            lists = asyncio.run(
+                scrape_concurrent([(url[0], int(url[1])) for url in urls], WORKERS)
+            )
         else:
-            with concurrent.futures.ProcessPoolExecutor(max_workers=WORKERS) as executor:
-                futures = [
-                    executor.submit(scrape, url[0], int(url[1]))
-                    for url in urls
-                ]
-                concurrent.futures.wait(futures)
-        
-        lists = {}
-        for file in os.listdir("links"):
-            if file.endswith("json") and file.startswith("links_"):
-                with open("links/" + file, "r") as f:
-                    data = json.load(f)
-                    for i in data.items():
-                        lists[i[0]] = i[1]
-                os.remove("links/" + file)
-        
+            if PARALLEL == "n":
+                for url in urls:
+                    scrape(url[0], int(url[1]))
+            else:
+                with concurrent.futures.ProcessPoolExecutor(max_workers=WORKERS) as executor:
+                    futures = [
+                        executor.submit(scrape, url[0], int(url[1]))
+                        for url in urls
+                    ]
+                    concurrent.futures.wait(futures)
+
+            lists = {}
+            for file in os.listdir("links"):
+                if file.endswith("json") and file.startswith("links_"):
+                    with open("links/" + file, "r") as f:
+                        data = json.load(f)
+                        for i in data.items():
+                            lists[i[0]] = i[1]
+                    os.remove("links/" + file)
+
         with open("links/links.json", "w") as f:
             json.dump(lists, f)
 
+        # Report throughput and the peak summed PSS of the whole process tree (workers and browsers) to compare the scraping modes
+        elapsed = time.perf_counter() - start_time
+        peak_pss = memory_monitor.stop() / (1024 * 1024)
+        console.log(
+            f"[bold green]Scraped [bold blue]{len(lists)} [bold green]links in [bold blue]{elapsed:.1f}s "
+            f"[bold green]([bold blue]{len(lists) / elapsed:.2f} [bold green]links/sec), peak PSS of the process tree: "
+            f"[bold blue]{peak_pss:.0f} MB"
+        )
+
     elif STAGE == "2":
         with open("links/links.json", "r") as f:
             links = json.load(f)
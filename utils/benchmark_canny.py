@@ -0,0 +1,88 @@
+import sys
+import time
+
+import numpy as np
+
+from utils.canny_utils import get_canny, svg_to_canny
+from utils.generating_utils import peel
+
+
+def make_logo(layers: int = 40, size: int = 1080):
+    """
+    Builds a synthetic logo SVG with the given number of clip-path and mask groups, followed by a text group
+
+    Args:
+        layers (int): The number of clip-path/mask groups
+        size (int): The width and height of the SVG
+    """
+    rng = np.random.default_rng(0)
+    defs = []
+    groups = []
+    for i in range(layers):
+        x, y = rng.integers(0, size - 200, size=2)
+        r = int(rng.integers(20, 100))
+        colour = "#%06x" % int(rng.integers(0, 0xFFFFFF))
+        if i % 2 == 0:
+            defs.append(
+                f'<clipPath id="c{i}"><rect x="{x}" y="{y}" width="200" height="200"/></clipPath>'
+            )
+            groups.append(
+                f'<g clip-path="url(#c{i})"><circle cx="{x + 100}" cy="{y + 100}" r="{r}" fill="{colour}"/></g>'
+            )
+        else:
+            defs.append(
+                f'<mask id="m{i}"><rect x="{x}" y="{y}" width="200" height="200" fill="white"/></mask>'
+            )
+            groups.append(
+                f'<g mask="url(#m{i})"><rect x="{x + 20}" y="{y + 20}" width="{2 * r}" height="{r}" fill="{colour}"/></g>'
+            )
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="0 0 {size} {size}">'
+        f'<defs>{"".join(defs)}</defs>'
+        f'<rect width="{size}" height="{size}" fill="#f0e0d0"/>'
+        f'{"".join(groups)}'
+        f'<g fill="#333333"><text x="{size // 2}" y="{size - 100}" font-size="80">LOGO</text></g>'
+        "</svg>"
+    )
+
+
+def benchmark(layers: int = 40):
+    """
+    Times the rendering and the edge detection of every variant generate() produces for a synthetic logo
+
+    Args:
+        layers (int): The number of clip-path/mask groups of the logo
+    """
+    render_time = 0.0
+    canny_time = 0.0
+    indices = []
+    for iteration, variant in peel(make_logo(layers=layers)):
+        start = time.perf_counter()
+        image = svg_to_canny(content=variant, save_only=True)
+        render_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        get_canny(image=image)
+        canny_time += time.perf_counter() - start
+        indices.append(iteration)
+
+    n = len(indices)
+    print(
+        f"{n} variants: svg2png {render_time:.3f}s ({render_time / n:.3f}s each), "
+        f"get_canny {canny_time:.3f}s ({canny_time / n:.3f}s each), "
+        f"the skipped render of the replaced variant saves about {(render_time + canny_time) / n:.3f}s per logo"
+    )
+
+    # The variants must keep the numbering of the files written before: 1..layers, the last being the cleaned content
+    return indices == (list(range(1, layers + 1)) or [0])
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m utils.benchmark_canny [layers]
+    layers = 40
+    if len(sys.argv) > 1:
+        layers = int(sys.argv[1])
+
+    if not benchmark(layers=layers):
+        sys.exit(1)
@@ -6,19 +6,31 @@ from io import BytesIO
 from cairosvg import svg2png
 
 
-def resize_numpy_image(image, max_resolution=1024 * 1024):
+def get_resized_shape(h, w, max_resolution=1024 * 1024):
     """
-    Resizes the image to a maximum resolution of 1024x1024
+    Computes the height and width to resize to, scaled to the maximum resolution and rounded to multiples of 64
 
     Args:
-        image (np.ndarray): The image to resize
+        h (int): The height of the image
+        w (int): The width of the image
         max_resolution (int): The maximum resolution to resize to
     """
-    h, w = image.shape[:2]
     k = max_resolution / (h * w)
     k = k**0.5
     h = int(np.round(h * k / 64)) * 64
     w = int(np.round(w * k / 64)) * 64
+    return h, w
+
+
+def resize_numpy_image(image, max_resolution=1024 * 1024):
+    """
+    Resizes the image to a maximum resolution of 1024x1024
+
+    Args:
+        image (np.ndarray): The image to resize
+        max_resolution (int): The maximum resolution to resize to
+    """
+    h, w = get_resized_shape(*image.shape[:2], max_resolution=max_resolution)
     image = cv2.resize(image, (w, h), interpolation=cv2.INTER_LANCZOS4)
     return image
 
@@ -95,3 +95,41 @@ def clean_content(content):
         start += 6
 
     return content
+
+
+def peel(content):
+    """
+    Removes the clip-path and mask groups one at a time, yielding each progressive variant with its index.
+    The last variant is replaced by the cleaned content, so it is yielded with the index of that variant
+    (or 0 when there are no groups) instead.
+
+    Args:
+        content (str): The content of the SVG file.
+
+    Yields:
+        tuple: The index and the content of each variant.
+    """
+    pending = None
+    iteration = 1
+    while True:
+        start_index_clip_path = content.find("<g clip-path")
+        start_index_mask = content.find("<g mask")
+
+        # Select minimum of the two indices
+        start_index = min(start_index_clip_path, start_index_mask)
+        if start_index == -1:
+            start_index = max(start_index_clip_path, start_index_mask)
+        if start_index == -1:
+            # No clip-path or mask found/left
+            break
+
+        # Fetch the end index of the clip-path or mask and remove the content
+        content = isolate(content, start_index + 1)
+
+        if pending is not None:
+            yield pending
+        pending = (iteration, content)
+        iteration += 1
+
+    # Finally, remove all possible rouge instances and convert the content to white text and black background
+    yield iteration - 1, clean_content(content)
@@ -0,0 +1,95 @@
+import os
+import threading
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+def get_pss(pid):
+    """
+    Reads the proportional set size of a process, which splits shared pages between the processes mapping them.
+    Falls back to the RSS when smaps_rollup is not available.
+
+    Args:
+        pid (int): The process id
+
+    Returns: The PSS in bytes
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except FileNotFoundError:
+        pass
+
+    with open(f"/proc/{pid}/statm", "r") as f:
+        return int(f.read().split()[1]) * PAGE_SIZE
+
+
+def get_tree_pss(pid):
+    """
+    Sums the proportional memory of a process and all of its descendants, read from /proc (Linux only)
+
+    Args:
+        pid (int): The process id at the root of the tree
+
+    Returns: The summed PSS in bytes
+    """
+    total = 0
+    pids = [pid]
+    while pids:
+        pid = pids.pop()
+        try:
+            total += get_pss(pid)
+
+            for task in os.listdir(f"/proc/{pid}/task"):
+                with open(f"/proc/{pid}/task/{task}/children", "r") as f:
+                    pids.extend(int(child) for child in f.read().split())
+        except OSError:
+            # The process exited while the tree was being walked
+            continue
+    return total
+
+
+class MemoryMonitor(object):
+    """
+    This class is used to sample the summed PSS of the current process tree in a background thread and keep its peak.
+
+    Methods:
+        start: Starts sampling
+        stop: Stops sampling and returns the peak
+
+    init:
+        interval (float): The number of seconds between samples
+    """
+
+    def __init__(self, interval: float = 0.5) -> None:
+        self.interval = interval
+        self.peak = 0
+        self.pid = os.getpid()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+
+    def sample(self):
+        """
+        Samples the process tree until stopped.
+        """
+        while not self.stop_event.is_set():
+            self.peak = max(self.peak, get_tree_pss(self.pid))
+            self.stop_event.wait(self.interval)
+
+    def start(self):
+        """
+        Starts sampling the process tree.
+        """
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops sampling the process tree.
+
+        Returns: The peak summed PSS in bytes
+        """
+        self.stop_event.set()
+        self.thread.join()
+        return self.peak